@@ -1,25 +1,22 @@
 import os
+import subprocess
+import tempfile
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # render to files only, no GUI event loop
 import matplotlib.pyplot as plt
-from moviepy import VideoFileClip
+from matplotlib.ticker import MultipleLocator
+from moviepy.config import FFMPEG_BINARY
 from scipy.io import wavfile
+from scipy.ndimage import uniform_filter1d
 
-def extract_audio_from_video(video_path, audio_path):
-    """
-    Extract the audio track from a video file and save it as a separate audio file.
+DB_SCALE = 20 / np.log(10)  # converts natural log to decibels
 
-    Parameters:
-        video_path (str): Path to the input video file.
-        audio_path (str): Path where the extracted audio file will be saved.
+Y_TICKS = np.arange(-60, 5, 5)  # loudness axis ticks in dB
+LOUDNESS_BLOCK_SAMPLES = 256 * 1024  # samples per block (~1 MB as float32) in compute_loudness/stream_loudness
+MAX_PLOT_POINTS = 4000  # more points than this are sub-pixel at the figure width
 
-    Raises:
-        ValueError: If the video file does not contain an audio track.
-    """
-    clip = VideoFileClip(video_path)
-    if clip.audio is not None:
-        clip.audio.write_audiofile(audio_path, logger=None)
-    else:
-        raise ValueError("No audio track found in the video file.")
+plt.style.use('seaborn-v0_8-darkgrid')
 
 
 def read_audio(audio_path):
@@ -31,52 +28,168 @@ def read_audio(audio_path):
 
     Returns:
         sr (int): Sample rate of the audio file.
-        audio (np.ndarray): Audio data as a numpy array. If the audio is stereo,
-        it is converted to mono by averaging the channels.
+        audio (np.ndarray): Audio data as a numpy array. Mono audio is returned as a
+        copy-on-write memory-mapped view of the file when the format allows it (24-bit
+        PCM cannot be mapped and is read into memory). If the audio is stereo,
+        it is converted to mono by averaging the channels, keeping the sample dtype.
     """
-    sr, audio = wavfile.read(audio_path)
+    try:
+        sr, audio = wavfile.read(audio_path, mmap=True)
+    except ValueError:
+        # scipy cannot memory-map some formats, e.g. 3-byte (24-bit) samples
+        sr, audio = wavfile.read(audio_path)
     if len(audio.shape) == 2:
-        audio = audio.mean(axis=1)
+        if np.issubdtype(audio.dtype, np.integer):
+            # Integer average in a wider accumulator; 2 channels reduce to a shift
+            acc = np.int32 if audio.dtype.itemsize <= 2 else np.int64
+            total = audio.sum(axis=1, dtype=acc)
+            if audio.shape[1] == 2:
+                total >>= 1
+            else:
+                total //= audio.shape[1]
+            audio = total.astype(audio.dtype)
+        else:
+            audio = audio.mean(axis=1, dtype=audio.dtype)
     return sr, audio
 
 
-def compute_loudness(audio, sr, frame_duration=1.0):
+def get_full_scale(dtype):
+    """
+    Return the full-scale amplitude for audio samples of the given dtype.
+
+    Parameters:
+        dtype (np.dtype): Sample dtype of the audio data.
+
+    Returns:
+        float: 2**(bits - 1) for integer PCM (32768 for int16, 128 for unsigned 8-bit),
+        1.0 for float audio. Unsigned samples are centred by compute_loudness first.
+    """
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.integer):
+        return 2.0 ** (np.iinfo(dtype).bits - 1)
+    return 1.0
+
+
+def compute_loudness(audio, sr, frame_duration=1.0, full_scale=None):
     """
     Compute the loudness of the audio in dB over time.
 
     Parameters:
-        audio (np.ndarray): Audio data as a numpy array.
+        audio (np.ndarray): Audio data as a numpy array. Unsigned PCM (e.g. 8-bit WAV)
+        is centred on its midpoint before the RMS is taken. Float audio is expected in
+        [-1.0, 1.0]; integer samples converted to float keep their integer scale and
+        need an explicit ``full_scale``.
         sr (int): Sample rate of the audio file.
         frame_duration (float): Duration of each frame in seconds.
+        full_scale (float): Amplitude that maps to 0 dB. Defaults to the full scale of
+        the audio dtype (see get_full_scale).
 
     Returns:
         times (np.ndarray): Array of time values corresponding to each frame.
         loudness_db (np.ndarray): Array of loudness values in dB for each frame.
     """
     try:
+        if full_scale is None:
+            full_scale = get_full_scale(audio.dtype)
+        log_scale = DB_SCALE * np.log(full_scale)
+        # Unsigned PCM stores silence at the midpoint of its range, not at zero
+        dc_offset = 0.0
+        if np.issubdtype(audio.dtype, np.unsignedinteger):
+            dc_offset = 2.0 ** (np.iinfo(audio.dtype).bits - 1)
         frame_size = int(sr * frame_duration)
+        n_full = len(audio) // frame_size
         n_frames = int(np.ceil(len(audio) / frame_size))
-        loudness_db = []
-        times = []
-        for i in range(n_frames):
-            start = i * frame_size
-            end = min((i + 1) * frame_size, len(audio))
-            frame = audio[start:end]
-            if len(frame) == 0:
-                continue
-
-            rms = np.sqrt(np.mean(frame.astype(float) ** 2))
-            if rms < 1e-10:
-                db = -100
-            else:
-                db = 20 * np.log10(rms / (2**15))
-            loudness_db.append(db)
-            times.append(start / sr)
-        return np.array(times), np.array(loudness_db)
+        rms = np.empty(n_frames, dtype=np.float32)
+        # Full frames are processed as (frames, frame_size) blocks; the sum of squares
+        # per row is one kernel call per block, and each block's float32 copy is
+        # small enough to stay in cache instead of converting the whole signal at once.
+        block_frames = max(1, LOUDNESS_BLOCK_SAMPLES // frame_size)
+        for start in range(0, n_full, block_frames):
+            stop = min(start + block_frames, n_full)
+            frames = audio[start * frame_size:stop * frame_size].reshape(stop - start, frame_size).astype(np.float32)
+            if dc_offset:
+                frames -= dc_offset
+            np.einsum('ij,ij->i', frames, frames, out=rms[start:stop])
+        rms[:n_full] /= frame_size
+        # The trailing partial frame (if any) is averaged over its own length
+        if n_frames > n_full:
+            tail = audio[n_full * frame_size:].astype(np.float32) - dc_offset
+            rms[n_full] = np.mean(tail ** 2)
+        np.sqrt(rms, out=rms)
+        times = np.arange(n_frames) * frame_size / sr
+        # 20*log10(rms / full_scale) as a natural log with the scale folded into a constant
+        loudness_db = np.where(rms < 1e-10, -100.0, DB_SCALE * np.log(np.maximum(rms, 1e-10)) - log_scale)
+        return times, loudness_db
     except Exception as err:
         raise RuntimeError(f"Error in compute_loudness: {err}")
 
 
+def stream_loudness(video_path, sr=16000, frame_duration=1.0, frames_per_read=None):
+    """
+    Decode the audio track of a video with ffmpeg and compute its loudness while streaming.
+
+    Mono 16-bit PCM is read from the ffmpeg pipe in blocks of ``frames_per_read``
+    frames and each block is reduced to loudness values as it arrives, so the
+    decoded audio is never held in memory as a whole and no temporary file is written.
+
+    Parameters:
+        video_path (str): Path to the input video file.
+        sr (int): Sample rate to resample the audio to.
+        frame_duration (float): Duration of each frame in seconds.
+        frames_per_read (int): Number of frames read from the pipe at a time. Defaults to
+        as many frames as fit in LOUDNESS_BLOCK_SAMPLES samples.
+
+    Returns:
+        times (np.ndarray): Array of time values corresponding to each frame.
+        loudness_db (np.ndarray): Array of loudness values in dB for each frame.
+
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the video file.
+        ValueError: If the video file does not contain an audio track.
+    """
+    command = [
+        FFMPEG_BINARY, '-loglevel', 'error', '-i', video_path,
+        '-map', '0:a:0', '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(sr), '-'
+    ]
+    frame_size = int(sr * frame_duration)
+    if frames_per_read is None:
+        frames_per_read = max(1, LOUDNESS_BLOCK_SAMPLES // frame_size)
+    block_bytes = frame_size * frames_per_read * np.dtype(np.int16).itemsize
+    times, loudness_db = [], []
+    offset = 0.0
+    # stderr goes to a temp file rather than a pipe: a pipe nobody reads while
+    # stdout is drained can fill up and block ffmpeg, deadlocking both sides
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+        try:
+            while True:
+                buf = proc.stdout.read(block_bytes)
+                if not buf:
+                    break
+                block = np.frombuffer(buf, dtype=np.int16)
+                block_times, block_db = compute_loudness(block, sr, frame_duration=frame_duration)
+                times.append(block_times + offset)
+                loudness_db.append(block_db)
+                offset += len(block) / sr
+            proc.wait()
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+        stderr_file.seek(0)
+        stderr = stderr_file.read()
+    stderr = stderr.decode(errors='replace').strip()
+    # An explicit audio map makes ffmpeg report a missing audio track distinctly
+    if proc.returncode != 0 and 'matches no streams' in stderr:
+        raise ValueError("No audio track found in the video file.")
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to decode {video_path}: {stderr}")
+    if not times:
+        raise ValueError("No audio track found in the video file.")
+    return np.concatenate(times), np.concatenate(loudness_db)
+
+
 def moving_average(data, window_size):
     """
     Compute the moving average of the data.
@@ -86,12 +199,35 @@ def moving_average(data, window_size):
         window_size (int): Size of the moving average window.
 
     Returns:
-        np.ndarray: Moving average of the input data.
+        np.ndarray: Moving average of the input data. Edges are padded with the
+        nearest value rather than zeros.
+    """
+    return uniform_filter1d(np.asarray(data, dtype=float), size=window_size, mode='nearest')
+
+
+def build_highlight_masks(times, loudness, highlights):
+    """
+    Build the boolean masks for all highlight sections in a single broadcast.
+
+    Parameters:
+        times (np.ndarray): Array of time values corresponding to each frame.
+        loudness (np.ndarray): Array of loudness values in dB for each frame.
+        highlights (list): List of dictionaries with ``start_time``, ``end_time`` and
+        ``threshold`` keys and an optional ``above`` flag (default False).
+
+    Returns:
+        np.ndarray: Boolean array of shape (len(highlights), len(times)); row k marks the
+        frames of highlight k that lie in its time range and on its side of the threshold.
     """
-    return np.convolve(data, np.ones(window_size)/window_size, mode='same')
+    starts = np.array([h['start_time'] for h in highlights], dtype=float)[:, None]
+    ends = np.array([h['end_time'] for h in highlights], dtype=float)[:, None]
+    thresholds = np.array([h['threshold'] for h in highlights], dtype=float)[:, None]
+    aboves = np.array([h.get('above', False) for h in highlights], dtype=bool)[:, None]
+    in_range = (times >= starts) & (times <= ends)
+    return in_range & np.where(aboves, loudness > thresholds, loudness < thresholds)
 
 
-def highlight_audio_section(ax, times, loudness, start_time, end_time, threshold, color, alpha=0.3, above=False):
+def highlight_audio_section(ax, times, loudness, condition, threshold, color, alpha=0.3):
     """ 
     Highlight a specific audio section on the graph.
 
@@ -99,31 +235,18 @@ def highlight_audio_section(ax, times, loudness, start_time, end_time, threshold
         ax (matplotlib.axes.Axes): The axes object to plot on.
         times (np.ndarray): Array of time values corresponding to each frame.
         loudness (np.ndarray): Array of loudness values in dB for each frame.
-        start_time (float): Start time of the audio section.
-        end_time (float): End time of the audio section.
-        threshold (float): Threshold value for highlighting the audio section.
+        condition (np.ndarray): Boolean mask of the frames to highlight (see build_highlight_masks).
+        threshold (float): Threshold value the highlighted area is filled to.
         color (str): Color of the highlighted audio section.
         alpha (float): Transparency of the highlighted audio section.
-        above (bool): Whether to highlight the audio section above or below the threshold.
     """
-    times_array = np.array(times)
-    loudness_array = np.array(loudness)
     try:
-        if above:
-            condition = ((times_array >= start_time) & (times_array <= end_time) & (loudness_array > threshold))
-            ax.fill_between(
-                times, loudness_array, threshold, where=condition, color=color, alpha=alpha
-            )
-        else:
-            condition = ((times_array >= start_time) & (times_array <= end_time) & (loudness_array < threshold))
-            ax.fill_between(
-                times, loudness_array, threshold, where=condition, color=color, alpha=alpha
-            )
+        ax.fill_between(times, loudness, threshold, where=condition, color=color, alpha=alpha)
     except Exception as err:
-        raise RuntimeError(f"Error highlighting audio section from {start_time} to {end_time}: {err}")
+        raise RuntimeError(f"Error highlighting audio section at threshold {threshold}: {err}")
 
 
-def plot_loudness(times, loudness, save_path, highlights=None):
+def plot_loudness(times, loudness, save_path, highlights=None, fig=None, ax=None, dpi=300):
     """
     Plot the loudness of the audio over time.
 
@@ -132,19 +255,59 @@ def plot_loudness(times, loudness, save_path, highlights=None):
         loudness (np.ndarray): Array of loudness values in dB for each frame.
         save_path (str): Path to save the generated graph.
         highlights (list): List of dictionaries containing highlight parameters.
+        fig (matplotlib.figure.Figure): Figure to draw on when ``ax`` is not given. Its first
+        axes are cleared and reused (one is added if it has none).
+        ax (matplotlib.axes.Axes): Axes to draw on. If neither ``fig`` nor ``ax`` is given, a
+        figure created on the first call is cleared and reused, so repeated calls do not
+        allocate new figures.
+        dpi (int): Resolution of the saved graph. Lower values (e.g. 150) save faster for review.
+
+    Returns:
+        fig (matplotlib.figure.Figure): The figure that was drawn on.
+        ax (matplotlib.axes.Axes): The axes that were drawn on.
     """
     try:
-        plt.style.use('seaborn-v0_8-darkgrid')
-        fig, ax = plt.subplots(figsize=(14, 6))
-        ax.plot(times, loudness, color='#1f77b4', linewidth=2.5, label='Loudness in dB')
+        if ax is None:
+            if fig is not None:
+                ax = fig.axes[0] if fig.axes else fig.add_subplot()
+            else:
+                if not hasattr(plot_loudness, '_fig'):
+                    plot_loudness._fig, plot_loudness._ax = plt.subplots(figsize=(14, 6))
+                ax = plot_loudness._ax
+            ax.cla()
+        fig = ax.figure
+        # Decimate the line for long videos; highlights below keep full resolution
+        stride = max(1, -(-len(times) // MAX_PLOT_POINTS))
+        plot_idx = np.arange(0, len(times), stride)
+        if plot_idx[-1] != len(times) - 1:
+            plot_idx = np.append(plot_idx, len(times) - 1)  # keep the line reaching times[-1]
+        ax.plot(times[plot_idx], loudness[plot_idx], color='#1f77b4', linewidth=2.5, label='Loudness in dB', rasterized=True)
         # Reference lines
         ax.axhline(y=-22, color='red', linestyle='--', linewidth=2, alpha=0.8, label='High Audio -22 dB')
         ax.axhline(y=-26, color='blue', linestyle='--', linewidth=2, alpha=0.8, label='Low Audio -26 dB')
 
         if highlights:
+            # Normalise each highlight first so a malformed entry only skips itself
+            valid_highlights = []
             for highlight in highlights:
                 try:
-                    highlight_audio_section(ax, times, loudness, **highlight)
+                    valid_highlights.append({
+                        'start_time': float(highlight['start_time']),
+                        'end_time': float(highlight['end_time']),
+                        'threshold': float(highlight['threshold']),
+                        'color': highlight['color'],
+                        'alpha': highlight.get('alpha', 0.3),
+                        'above': bool(highlight.get('above', False)),
+                    })
+                except Exception as err:
+                    print(f"Warning: Failed to highlight section {highlight}: {err}")
+            masks = build_highlight_masks(times, loudness, valid_highlights) if valid_highlights else []
+            for highlight, condition in zip(valid_highlights, masks):
+                try:
+                    highlight_audio_section(
+                        ax, times, loudness, condition, highlight['threshold'],
+                        highlight['color'], alpha=highlight['alpha']
+                    )
                 except Exception as err:
                     print(f"Warning: Failed to highlight section {highlight}: {err}")
 
@@ -159,50 +322,41 @@ def plot_loudness(times, loudness, save_path, highlights=None):
         ax.set_xlabel('Time (s)', fontsize=14)
         ax.set_ylabel('Loudness (dB)', fontsize=14)
         ax.set_title('Audio Loudness Over Time', fontsize=18, weight='bold')
-        ax.set_yticks(np.arange(-60, 5, 5))
+        ax.set_yticks(Y_TICKS)
         ax.set_ylim(-60, 0)
-        ax.set_xticks(np.arange(0, times[-1] + 5, 5))
+        ax.xaxis.set_major_locator(MultipleLocator(5))
         ax.set_xlim(0, times[-1])
         ax.tick_params(axis='both', which='major', labelsize=12)
         # Deduplicate legend entries
         handles, labels = ax.get_legend_handles_labels()
         unique = dict()
         for h, l in zip(handles, labels):
-            if l not in unique and l != "":
-                unique[l] = h
+            if l:
+                unique.setdefault(l, h)
         ax.legend(unique.values(), unique.keys(), fontsize=13)
         ax.grid(True, which='both', linestyle='--', linewidth=0.7, alpha=0.7)
-        plt.tight_layout()
+        fig.tight_layout()
         if save_path:
             try:
-                plt.savefig(save_path, dpi=300, bbox_inches='tight')
+                fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
             except Exception as err:
                 print(f"Error saving figure to {save_path}: {err}")
-            finally:
-                plt.close()
+        return fig, ax
     except Exception as err:
         raise RuntimeError(f"Error occurred while plotting loudness: {err}")
 
 
 def main(video_path: str, output_graph_path: str, graph_name: str, highlights: list = []):
-    AUDIO_TEMP_PATH = 'temp_audio.wav'
+    SAMPLE_RATE = 16000  # Hz
     FRAME_DURATION = 0.1  # seconds
     smooth_window = 3
     save_path = os.path.join(output_graph_path, graph_name)
     try:
-        extract_audio_from_video(video_path, AUDIO_TEMP_PATH)
-        sr, audio = read_audio(AUDIO_TEMP_PATH)
-        times, loudness_db = compute_loudness(audio, sr, frame_duration=FRAME_DURATION)
+        times, loudness_db = stream_loudness(video_path, sr=SAMPLE_RATE, frame_duration=FRAME_DURATION)
         loudness_db_smooth = moving_average(loudness_db, smooth_window)
         plot_loudness(times, loudness_db_smooth, save_path, highlights=highlights)
     except Exception as err:
         print(f"Error in main: {err}")
-    finally:
-        if os.path.exists(AUDIO_TEMP_PATH):
-            try:
-                os.remove(AUDIO_TEMP_PATH)
-            except Exception as err:
-                print(f"Error removing temp audio file: {err}")
 
 if __name__ == "__main__":
     VIDEO_PATH = 'D:\\Projects\\Fun\\Audio_graph_plot\\assets\\audio_anomaly_all3.mp4'
@@ -8,5 +8,6 @@ class SummaryAgent(AssistantAgent):
 
     def summarize_outputs(self, agent_outputs):
         # Simple merge and summarize logic
-        summary = "\n".join([f"{k}: {v}" for k, v in agent_outputs.items()])
-        return f"Summary ({self.summary_strategy}):\n{summary}" 
\ No newline at end of file
+        lines = [f"Summary ({self.summary_strategy}):"]
+        lines.extend(f"{k}: {v}" for k, v in agent_outputs.items())
+        return "\n".join(lines) 
\ No newline at end of file
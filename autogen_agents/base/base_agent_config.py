@@ -1,17 +1,15 @@
-from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict
 
-class AgentConfig(ABC):
-    def __init__(self, agent_name: str, description: str, mcp_path: str, system_prompt: str):
-        self.agent_name = agent_name
-        self.description = description
-        self.mcp_path = mcp_path
-        self.system_prompt = system_prompt
+@dataclass(frozen=True, slots=True, kw_only=True)
+class AgentConfig:
+    agent_name: str
+    description: str
+    mcp_path: str
+    system_prompt: str
+
+    def __post_init__(self):
+        if type(self) is AgentConfig:
+            raise TypeError("AgentConfig is abstract; instantiate one of its subclasses")
 
-    @abstractmethod
     def to_dict(self):
-        return {
-            "agent_name": self.agent_name,
-            "description": self.description,
-            "mcp_path": self.mcp_path,
-            "system_prompt": self.system_prompt
-        } 
\ No newline at end of file
+        return asdict(self)
@@ -6,29 +6,38 @@ from configs.agent_configs import (
 )
 from agents.summary_agent import SummaryAgent
 
-def create_agent(agent_config):
-    config = agent_config.to_dict()
+def _create_decider_agent(agent_config):
+    return DeciderAgent(
+        name=agent_config.agent_name,
+        description=agent_config.description,
+        agent_list=agent_config.agent_list,
+        strategy=agent_config.strategy,
+        system_prompt=agent_config.system_prompt
+    )
+
+def _create_summary_agent(agent_config):
+    return SummaryAgent(
+        name=agent_config.agent_name,
+        description=agent_config.description,
+        system_prompt=agent_config.system_prompt,
+        output_sources=agent_config.output_sources,
+        summary_strategy=agent_config.summary_strategy
+    )
+
+def _create_assistant_agent(agent_config):
+    return AssistantAgent(
+        name=agent_config.agent_name,
+        description=agent_config.description,
+        mcp_path=agent_config.mcp_path,
+        system_prompt=agent_config.system_prompt
+    )
 
-    if isinstance(agent_config, DeciderAgentConfig):
-        return DeciderAgent(
-            name=config["agent_name"],
-            description=config["description"],
-            agent_list=config["agent_list"],
-            strategy=config["strategy"],
-            system_prompt=config["system_prompt"]
-        )
-    elif isinstance(agent_config, SummaryAgentConfig):
-        return SummaryAgent(
-            name=config["agent_name"],
-            description=config["description"],
-            system_prompt=config["system_prompt"],
-            output_sources=config["output_sources"],
-            summary_strategy=config["summary_strategy"]
-        )
-    else:
-        return AssistantAgent(
-            name=config["agent_name"],
-            description=config["description"],
-            mcp_path=config["mcp_path"],
-            system_prompt=config["system_prompt"]
-        ) 
\ No newline at end of file
+# Config type -> builder; any other config type becomes a plain AssistantAgent
+_AGENT_BUILDERS = {
+    DeciderAgentConfig: _create_decider_agent,
+    SummaryAgentConfig: _create_summary_agent,
+}
+
+def create_agent(agent_config):
+    builder = _AGENT_BUILDERS.get(type(agent_config), _create_assistant_agent)
+    return builder(agent_config)